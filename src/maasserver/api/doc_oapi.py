@@ -7,13 +7,20 @@ This definition follows the rules and limitations of the ReST documentation.
 (see doc.py and doc_handler.py).
 """
 
+from copy import deepcopy
+from functools import lru_cache
 from inspect import getdoc
-import json
 from textwrap import dedent
 
 from django.http import HttpResponse
+from django.views.generic import TemplateView
 import yaml
 
+try:
+    from yaml import CSafeDumper as YAMLDumper
+except ImportError:  # PyYAML built without libyaml support.
+    from yaml import SafeDumper as YAMLDumper
+
 from maasserver.api import support
 from maasserver.api.annotations import APIDocstringParser
 from maasserver.api.doc import find_api_resources, generate_doc
@@ -21,33 +28,85 @@ from maasserver.djangosettings import settings
 from maasserver.models.config import Config
 from maasserver.models.controllerinfo import get_maas_version
 from maasserver.utils import build_absolute_uri
+from provisioningserver.utils.json import json_dumps
+
+_LANDING_PAGE_TEMPLATE = {
+    "title": "MAAS API",
+    "description": "API landing page for MAAS",
+    "resources": [
+        {
+            "path": "/MAAS/api",
+            "rel": "self",
+            "type": "application/json",
+            "title": "this document",
+        },
+        {
+            "path": f"{settings.API_URL_PREFIX}openapi.yaml",
+            "rel": "service-desc",
+            "type": "application/openapi+yaml",
+            "title": "the API definition",
+        },
+        {
+            "path": "/MAAS/api/docs/",
+            "rel": "service-doc",
+            "type": "text/html",
+            "title": "the API documentation",
+        },
+        {
+            "path": f"{settings.API_URL_PREFIX}openapi.json",
+            "rel": "service-desc",
+            "type": "application/json",
+            "title": "the API definition",
+        },
+    ],
+}
+
+# Map the parameter types of API docstrings to OpenAPI types.
+_OAPI_TYPES = {
+    "Boolean": "boolean",
+    "Float": "number",
+    "Int": "integer",
+    "String": "string",
+}
+
+# Map the (lowercase) MAAS themes to their header colour.
+_THEME_COLOURS = {
+    "bark": "#585841",
+    "blue": "#0060bf",
+    "magenta": "#974097",
+    "olive": "#3d5f11",
+    "prussian green": "#225d5c",
+    "purple": "#7764d8",
+    "red": "#a71b33",
+    "sage": "#4e5f51",
+    "viridian": "#025a3d",
+}
 
 
 def openapi_docs_context(request):
     """Return the aadditional context needed for the oapi doc template to function"""
-    colourmap = {
-        "bark": "#585841",
-        "blue": "#0060bf",
-        "magenta": "#974097",
-        "olive": "#3d5f11",
-        "prussian green": "#225d5c",
-        "purple": "#7764d8",
-        "red": "#a71b33",
-        "sage": "#4e5f51",
-        "viridian": "#025a3d",
-    }
-    local_server = _get_maas_servers()[0]
+    configs = Config.objects.get_configs(["theme", "maas_url", "maas_name"])
+    local_server = _get_maas_servers(configs)[0]
     context = {
-        "openapi_url": local_server["url"] + "openapi.yaml",
-        "maas_colour": colourmap.get(
-            Config.objects.get_config("theme").lower(), "#262626"
-        ),
-        "maas_name": local_server["description"].removesuffix(" API"),
+        "openapi_url": local_server["url"] + "openapi.json",
+        "maas_colour": _THEME_COLOURS.get(configs["theme"].lower(), "#262626"),
+        "maas_name": configs["maas_name"],
         "maas_version": get_maas_version(),
     }
     return context
 
 
+class OpenAPIDocsView(TemplateView):
+    """Render the OpenAPI documentation page."""
+
+    template_name = "openapi.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(openapi_docs_context(self.request))
+        return context
+
+
 def landing_page(request):
     """Render a landing page with pointers for the MAAS API.
 
@@ -59,7 +118,7 @@ def landing_page(request):
         link["href"] = build_absolute_uri(request, link["path"])
     # Return as a JSON document
     return HttpResponse(
-        json.dumps(description),
+        json_dumps(description),
         content_type="application/json",
     )
 
@@ -70,45 +129,74 @@ def endpoint(request):
     :return: An `HttpResponse` containing a YAML document that complies
         with the OpenApi spec 3.0.
     """
-    description = get_api_endpoint()
+    configs = Config.objects.get_configs(["maas_url", "maas_name"])
     # Return as a YAML document
     return HttpResponse(
-        yaml.dump(description),
+        _render_api_endpoint(configs["maas_url"], configs["maas_name"]),
         content_type="application/openapi+yaml",
     )
 
 
+@lru_cache(maxsize=1)
+def _render_api_endpoint(maas_url, maas_name):
+    """Return the API endpoint rendered as UTF-8 encoded YAML.
+
+    The API definition only changes with the code, so the rendered document
+    is cached, keyed on the configuration values it depends upon. It is
+    kept as bytes, so responses don't need to encode it again.
+    """
+    return yaml.dump(
+        get_api_endpoint({"maas_url": maas_url, "maas_name": maas_name}),
+        Dumper=YAMLDumper,
+        default_flow_style=False,
+        sort_keys=False,
+        encoding="utf-8",
+    )
+
+
+def json_endpoint(request):
+    """Render the OpenApi endpoint as JSON.
+
+    :return: An `HttpResponse` containing a JSON document that complies
+        with the OpenApi spec 3.0.
+    """
+    configs = Config.objects.get_configs(["maas_url", "maas_name"])
+    # Return as a JSON document
+    return HttpResponse(
+        _render_api_endpoint_json(configs["maas_url"], configs["maas_name"]),
+        content_type="application/json",
+    )
+
+
+@lru_cache(maxsize=1)
+def _render_api_endpoint_json(maas_url, maas_name):
+    """Return the API endpoint rendered as JSON.
+
+    This is cached in the same way as `_render_api_endpoint`.
+    """
+    return json_dumps(
+        get_api_endpoint({"maas_url": maas_url, "maas_name": maas_name})
+    )
+
+
 def get_api_landing_page():
     """Return the API landing page"""
-    description = {
-        "title": "MAAS API",
-        "description": "API landing page for MAAS",
+    return {
+        **_LANDING_PAGE_TEMPLATE,
         "resources": [
-            {
-                "path": "/MAAS/api",
-                "rel": "self",
-                "type": "application/json",
-                "title": "this document",
-            },
-            {
-                "path": f"{settings.API_URL_PREFIX}openapi.yaml",
-                "rel": "service-desc",
-                "type": "application/openapi+yaml",
-                "title": "the API definition",
-            },
-            {
-                "path": "/MAAS/api/docs/",
-                "rel": "service-doc",
-                "type": "text/html",
-                "title": "the API documentation",
-            },
+            {**resource} for resource in _LANDING_PAGE_TEMPLATE["resources"]
         ],
     }
-    return description
 
 
-def get_api_endpoint():
-    """Return the API endpoint"""
+def get_api_endpoint(configs=None):
+    """Return the API endpoint
+
+    :param configs: Optional mapping holding the already fetched `maas_url`
+        and `maas_name` config values.
+    """
+    if configs is None:
+        configs = Config.objects.get_configs(["maas_url", "maas_name"])
     description = {
         "openapi": "3.0.0",
         "info": {
@@ -125,20 +213,20 @@ def get_api_endpoint():
             "description": "MAAS API documentation",
             "url": "/MAAS/docs/api.html",
         },
-        "servers": _get_maas_servers(),
+        "servers": _get_maas_servers(configs),
     }
     return description
 
 
-def _get_maas_servers():
+def _get_maas_servers(configs):
     """Return a servers defintion of the public-facing MAAS address.
 
+    :param configs: Mapping holding the `maas_url` and `maas_name` config
+        values.
     :return: An object describing the MAAS public-facing server.
     """
-    maas_url = (
-        Config.objects.get_config("maas_url").rstrip("/").removesuffix("/MAAS")
-    )
-    maas_name = Config.objects.get_config("maas_name")
+    maas_url = configs["maas_url"].rstrip("/").removesuffix("/MAAS")
+    maas_name = configs["maas_name"]
     return [
         {
             "url": f"{maas_url}{settings.API_URL_PREFIX}",
@@ -147,6 +235,12 @@ def _get_maas_servers():
     ]
 
 
+@lru_cache(maxsize=None)
+def _generate_doc(handler):
+    """Return the documentation of `handler`, generating it only once."""
+    return generate_doc(handler)
+
+
 def _new_path_item(params):
     path_item = {}
     for p in params:
@@ -170,28 +264,17 @@ def _render_oapi_oper_item(http_method, op, doc, uri_params, function):
         "description": dedent(doc.doc).strip(),
         "responses": {},
     }
-    oper_docstring = _oapi_item_from_docstring(
-        function, http_method, uri_params
+    # Copy the cached item, so that operations don't share any objects.
+    oper_docstring = deepcopy(
+        _oapi_item_from_docstring(function, http_method, tuple(uri_params))
     )
     # Only overwrite the values that are non-blank
     oper_obj.update({k: v for k, v in oper_docstring.items() if v})
     return oper_obj
 
 
+@lru_cache(maxsize=None)
 def _oapi_item_from_docstring(function, http_method, uri_params):
-    def _type_to_string(schema):
-        match schema:
-            case "Boolean":
-                return "boolean"
-            case "Float":
-                return "number"
-            case "Int":
-                return "integer"
-            case "String":
-                return "string"
-            case other:
-                return "object"
-
     def _response_pair(ap_dict):
         status_code = "HTTP Status Code"
         status = content = {}
@@ -208,10 +291,10 @@ def _oapi_item_from_docstring(function, http_method, uri_params):
         return zip(paired, paired)
 
     oper_obj = {}
-    body = {
-        "type": "object",
-        "additionalProperties": {"type": "string"},
-    }
+    parameters = []
+    properties = {}
+    required_properties = []
+    responses = {}
     ap = APIDocstringParser()
     docstring = getdoc(function)
     if docstring and ap.is_annotated_docstring(docstring):
@@ -229,22 +312,18 @@ def _oapi_item_from_docstring(function, http_method, uri_params):
                     "in": "path" if name in uri_params else "query",
                     "description": description,
                     "schema": {
-                        "type": _type_to_string(param["type"]),
+                        "type": _OAPI_TYPES.get(param["type"], "object"),
                     },
                     "required": required,
                 }
-                oper_obj.setdefault("parameters", []).append(param_dict)
+                parameters.append(param_dict)
             elif http_method.lower() in ("put", "post"):
-                body.setdefault("properties", {}).update(
-                    {
-                        name: {
-                            "description": description,
-                            "type": _type_to_string(param["type"]),
-                        }
-                    }
-                )
+                properties[name] = {
+                    "description": description,
+                    "type": _OAPI_TYPES.get(param["type"], "object"),
+                }
                 if required:
-                    body.setdefault("required", []).append(name)
+                    required_properties.append(name)
 
         for (status, content) in _response_pair(ap_dict):
             response = {
@@ -272,48 +351,63 @@ def _oapi_item_from_docstring(function, http_method, uri_params):
             status_code = status["name"]
             if not status_code.isdigit():
                 status_code = status["description_stripped"]
-            oper_obj.setdefault("responses", {}).update(
-                {status_code: response},
-            )
-
-    if body.get("properties"):
-        oper_obj.update(
-            {
-                "requestBody": {
-                    "required": True,
-                    "content": {
-                        "application/json": {
-                            "schema": {**body},
-                        },
-                    },
-                }
-            }
-        )
+            responses[status_code] = response
+
+    if parameters:
+        oper_obj["parameters"] = parameters
+    if responses:
+        oper_obj["responses"] = responses
+    if properties:
+        body = {
+            "type": "object",
+            "additionalProperties": {"type": "string"},
+            "properties": properties,
+        }
+        if required_properties:
+            body["required"] = required_properties
+        oper_obj["requestBody"] = {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": body,
+                },
+            },
+        }
 
     return oper_obj
 
 
-def _render_oapi_paths():
+@lru_cache(maxsize=1)
+def _get_api_resources():
+    """Return the API handlers, each with its exports.
+
+    The URLconf doesn't change while running, so this is only done once.
+    """
     from maasserver import urls_api as urlconf
 
-    def _resource_key(resource):
-        return resource.handler.__class__.__name__
+    def _handler_key(handler):
+        return handler.__module__, handler.__qualname__
 
-    def _export_key(export):
-        (http_method, op), function = export
-        return http_method, op or "", function
+    handlers = {
+        type(resource.handler) for resource in find_api_resources(urlconf)
+    }
+    # Iterate in a stable order, so that when handlers render the same path
+    # the same one wins in every process.
+    return tuple(
+        (handler, tuple(handler.exports.items()))
+        for handler in sorted(handlers, key=_handler_key)
+    )
 
-    resources = find_api_resources(urlconf)
+
+def _render_oapi_paths():
     paths = {}
 
-    for res in sorted(resources, key=_resource_key):
-        handler = type(res.handler)
-        doc = generate_doc(handler)
+    for handler, exports in _get_api_resources():
+        doc = _generate_doc(handler)
         uri = doc.resource_uri_template
-        exports = handler.exports.items()
         (_, params) = doc.handler.resource_uri()
 
-        for (http_method, op), function in sorted(exports, key=_export_key):
+        for (http_method, op), function in exports:
             oper_uri = f"{uri}op-{op}" if op else uri
             path_item = paths.setdefault(
                 f"/{oper_uri.removeprefix(settings.API_URL_PREFIX)}",
@@ -322,4 +416,5 @@ def _render_oapi_paths():
             path_item[http_method.lower()] = _render_oapi_oper_item(
                 http_method, op, doc, params, function
             )
-    return paths
+    # Sort the paths for a stable output.
+    return dict(sorted(paths.items()))
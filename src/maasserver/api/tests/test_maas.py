@@ -20,7 +20,7 @@ from testtools.matchers import (
 
 from maasserver.forms.settings import CONFIG_ITEMS_KEYS
 from maasserver.models import PackageRepository
-from maasserver.models.config import Config, DEFAULT_CONFIG
+from maasserver.models.config import Config, get_default_config
 from maasserver.testing.api import APITestCase
 from maasserver.testing.factory import factory
 from maasserver.testing.osystems import (
@@ -55,7 +55,7 @@ class TestForbiddenNames(MAASTestCase):
         # The difference between the set of possible configuration keys and
         # those permitted via the Web API is small but important to security.
         self.assertThat(
-            set(DEFAULT_CONFIG).difference(CONFIG_ITEMS_KEYS),
+            set(get_default_config()).difference(CONFIG_ITEMS_KEYS),
             Equals(FORBIDDEN_NAMES),
         )
 
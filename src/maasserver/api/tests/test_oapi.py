@@ -1,19 +1,25 @@
 # Copyright 2012-2016 Canonical Ltd.  This software is licensed under the
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
+import http.client
 import json
 
+from django.urls import reverse
 import yaml
 
+from maasserver.api import doc_oapi
 from maasserver.api.doc_oapi import (
+    _render_api_endpoint,
     _render_oapi_paths,
     endpoint,
+    json_endpoint,
     landing_page,
     openapi_docs_context,
 )
 from maasserver.models.config import Config
 from maasserver.testing.factory import factory
 from maasserver.testing.testcase import MAASServerTestCase
+from maastesting.djangotestcase import count_queries
 from maastesting.testcase import MAASTestCase
 
 
@@ -29,6 +35,11 @@ class TestLandingPage(MAASTestCase):
             self.assertEqual(link["href"], href)
         self.assertEqual(resources[0]["type"], page["content-type"])
 
+    def test_does_not_modify_template(self):
+        landing_page(factory.make_fake_request())
+        for resource in doc_oapi._LANDING_PAGE_TEMPLATE["resources"]:
+            self.assertNotIn("href", resource)
+
 
 class TestApiEndpoint(MAASServerTestCase):
     def test_required_fields(self):
@@ -57,18 +68,84 @@ class TestApiEndpoint(MAASServerTestCase):
         )
         self.assertEqual(maasserver["description"], f"{maas_name} API")
 
+    def test_caches_rendered_document(self):
+        _render_api_endpoint.cache_clear()
+        self.addCleanup(_render_api_endpoint.cache_clear)
+        get_api_endpoint = self.patch(doc_oapi, "get_api_endpoint")
+        get_api_endpoint.return_value = {"openapi": "3.0.0"}
+        request = factory.make_fake_request()
+        endpoint(request)
+        page = endpoint(request)
+        self.assertEqual({"openapi": "3.0.0"}, yaml.safe_load(page.content))
+        get_api_endpoint.assert_called_once()
+
+    def test_renders_bytes(self):
+        _render_api_endpoint.cache_clear()
+        self.addCleanup(_render_api_endpoint.cache_clear)
+        self.assertIsInstance(
+            _render_api_endpoint("http://localhost:5240/MAAS", "maas"), bytes
+        )
+
+    def test_cache_follows_maas_name(self):
+        request = factory.make_fake_request()
+        Config.objects.set_config("maas_name", "first")
+        endpoint(request)
+        Config.objects.set_config("maas_name", "second")
+        page = endpoint(request)
+        content = yaml.safe_load(page.content)
+        self.assertEqual(content["servers"][0]["description"], "second API")
+
+    def test_reads_config_in_one_query(self):
+        request = factory.make_fake_request()
+        endpoint(request)
+        count, _ = count_queries(endpoint, request)
+        self.assertEqual(1, count)
+
+
+class TestApiJsonEndpoint(MAASServerTestCase):
+    def test_matches_yaml_endpoint(self):
+        request = factory.make_fake_request()
+        page = json_endpoint(request)
+        self.assertEqual("application/json", page["content-type"])
+        self.assertEqual(
+            yaml.safe_load(endpoint(request).content), json.loads(page.content)
+        )
+
 
 class TestOAPIDocs(MAASServerTestCase):
     def test_docs_point_to_api(self):
         request = factory.make_fake_request()
         page = landing_page(request)
         content = json.loads(page.content)
-        oapi_res = content["resources"][1]
+        [oapi_res] = [
+            resource
+            for resource in content["resources"]
+            if resource["type"] == "application/json"
+            and resource["rel"] == "service-desc"
+        ]
         context = openapi_docs_context(request)
         self.assertEqual(
             context["openapi_url"], f"http://localhost:5240{oapi_res['path']}"
         )
 
+    def test_docs_context_maps_theme_to_colour(self):
+        Config.objects.set_config("theme", "Red")
+        context = openapi_docs_context(factory.make_fake_request())
+        self.assertEqual("#a71b33", context["maas_colour"])
+
+    def test_docs_context_defaults_colour_for_unknown_theme(self):
+        Config.objects.set_config("theme", factory.make_name("theme"))
+        context = openapi_docs_context(factory.make_fake_request())
+        self.assertEqual("#262626", context["maas_colour"])
+
+    def test_docs_view_renders_context(self):
+        Config.objects.set_config("maas_name", "my-maas")
+        self.client.login(user=factory.make_User())
+        response = self.client.get(reverse("api_docs"))
+        self.assertEqual(http.client.OK, response.status_code)
+        self.assertEqual("my-maas", response.context["maas_name"])
+        self.assertIn("openapi_url", response.context)
+
 
 class TestOAPISpec(MAASServerTestCase):
     def setUp(self):
@@ -90,6 +167,24 @@ class TestOAPISpec(MAASServerTestCase):
         # TODO add actual tests
         _render_oapi_paths()
 
+    def test_resources_are_in_a_stable_order(self):
+        handlers = [handler for handler, _ in doc_oapi._get_api_resources()]
+        self.assertEqual(
+            sorted(
+                handlers,
+                key=lambda handler: (handler.__module__, handler.__qualname__),
+            ),
+            handlers,
+        )
+
+    def test_paths_reuse_parsed_docstrings(self):
+        paths = _render_oapi_paths()
+        misses = doc_oapi._oapi_item_from_docstring.cache_info().misses
+        self.assertEqual(paths, _render_oapi_paths())
+        self.assertEqual(
+            misses, doc_oapi._oapi_item_from_docstring.cache_info().misses
+        )
+
     def test_path_parameters(self):
         for path in _render_oapi_paths().values():
             if "parameters" not in path:
@@ -202,6 +202,8 @@ MIDDLEWARE = (
     "maasserver.middleware.ExceptionMiddleware",
     # Used to clear the RBAC thread-local cache.
     "maasserver.middleware.RBACMiddleware",
+    # Used to cache config values for the duration of a request.
+    "maasserver.middleware.ConfigCacheMiddleware",
     # Handle errors that should really be handled in application code:
     # NoConnectionsAvailable, PowerActionAlreadyInProgress, TimeoutError.
     # FIXME.
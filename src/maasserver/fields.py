@@ -22,7 +22,7 @@ __all__ = [
 ]
 
 from copy import deepcopy
-from json import dumps, loads
+from json import dumps
 import re
 
 from django import forms
@@ -41,6 +41,7 @@ from maasserver.models.versionedtextfile import VersionedTextFile
 from maasserver.utils.converters import parse_systemd_interval
 from maasserver.utils.dns import validate_domain_name, validate_hostname
 from maasserver.utils.orm import get_one, validate_in_transaction
+from provisioningserver.utils.json import json_loads
 
 # Validator for the name attribute of model entities.
 MODEL_NAME_VALIDATOR = RegexValidator(r"^\w[ \w-]*$")
@@ -301,7 +302,7 @@ class JSONObjectField(Field):
         if value is not None:
             if isinstance(value, str):
                 try:
-                    return loads(value)
+                    return json_loads(value)
                 except ValueError:
                     pass
             return value
@@ -7,7 +7,7 @@ from django.http import HttpRequest
 from maasserver.enum import ENDPOINT_CHOICES
 from maasserver.forms import ConfigForm
 from maasserver.models import Config
-from maasserver.models.config import DEFAULT_CONFIG
+import maasserver.models.config
 from maasserver.testing.factory import factory
 from maasserver.testing.testcase import MAASServerTestCase
 
@@ -72,10 +72,11 @@ class TestConfigForm(MAASServerTestCase):
 
     def test_form_loads_initial_values_from_default_value(self):
         value = factory.make_string()
-        DEFAULT_CONFIG["field1"] = value
-        # Remove the added config from the DEFAULT_CONFIG or it will
-        # break other tests.
-        self.addCleanup(lambda: DEFAULT_CONFIG.pop("field1"))
+        self.patch(
+            maasserver.models.config,
+            "_get_default_config",
+            lambda: {"field1": value},
+        )
         form = TestOptionForm()
 
         self.assertEqual({"field1": value}, form.initial)
@@ -519,3 +519,22 @@ class RBACMiddleware:
         # state of the RBAC connection.
         rbac.clear()
         return result
+
+
+class ConfigCacheMiddleware:
+    """Middleware that caches config values for the duration of a request.
+
+    Config items are read many times while handling a single request, but
+    rarely change. The thread-local cache of `Config.objects` is enabled
+    for the request and discarded once the response has been handled.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        Config.objects.enable_cache()
+        try:
+            return self.get_response(request)
+        finally:
+            Config.objects.disable_cache()
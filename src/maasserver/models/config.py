@@ -4,10 +4,11 @@
 """Configuration items."""
 
 
-from collections import defaultdict, namedtuple
+from collections import namedtuple
 import copy
-from datetime import timedelta
+from functools import lru_cache
 from socket import gethostname
+import threading
 
 from django.db.models import CharField, Manager, Model
 from django.db.models.signals import post_save
@@ -27,21 +28,17 @@ DNSSEC_VALIDATION_CHOICES = [
 NETWORK_DISCOVERY_CHOICES = [("enabled", "Enabled"), ("disabled", "Disabled")]
 
 
-def _timedelta_to_whole_seconds(**kwargs) -> int:
-    """Convert arbitrary timedelta to whole seconds."""
-    return int(timedelta(**kwargs).total_seconds())
-
-
+# Intervals are in whole seconds.
 ACTIVE_DISCOVERY_INTERVAL_CHOICES = [
     (0, "Never (disabled)"),
-    (_timedelta_to_whole_seconds(days=7), "Every week"),
-    (_timedelta_to_whole_seconds(days=1), "Every day"),
-    (_timedelta_to_whole_seconds(hours=12), "Every 12 hours"),
-    (_timedelta_to_whole_seconds(hours=6), "Every 6 hours"),
-    (_timedelta_to_whole_seconds(hours=3), "Every 3 hours"),
-    (_timedelta_to_whole_seconds(hours=1), "Every hour"),
-    (_timedelta_to_whole_seconds(minutes=30), "Every 30 minutes"),
-    (_timedelta_to_whole_seconds(minutes=10), "Every 10 minutes"),
+    (7 * 24 * 60 * 60, "Every week"),
+    (24 * 60 * 60, "Every day"),
+    (12 * 60 * 60, "Every 12 hours"),
+    (6 * 60 * 60, "Every 6 hours"),
+    (3 * 60 * 60, "Every 3 hours"),
+    (60 * 60, "Every hour"),
+    (30 * 60, "Every 30 minutes"),
+    (10 * 60, "Every 10 minutes"),
 ]
 
 
@@ -82,7 +79,7 @@ def get_default_config():
         "maas_syslog_port": 5247,
         # Network discovery.
         "network_discovery": "enabled",
-        "active_discovery_interval": _timedelta_to_whole_seconds(hours=3),
+        "active_discovery_interval": 3 * 60 * 60,
         "active_discovery_last_scan": 0,
         # RPC configuration.
         "rpc_region_certificate": None,
@@ -148,8 +145,29 @@ def get_default_config():
     }
 
 
-# Default values for config options.
-DEFAULT_CONFIG = get_default_config()
+@lru_cache(maxsize=1)
+def _get_default_config():
+    """Return the default values for config options.
+
+    These are computed on first use rather than at import time, since doing
+    so looks up the hostname.
+    """
+    return get_default_config()
+
+
+# Marks a config item that has been looked up but is not in the database.
+_NOT_SET = object()
+
+# Config values of these types can be handed out without copying.
+_IMMUTABLE_TYPES = (str, int, float, bool, type(None))
+
+
+def _copy_value(value):
+    """Return a copy of `value` that callers are free to modify."""
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    return copy.deepcopy(value)
+
 
 # Encapsulates the possible states for network discovery
 NetworkDiscoveryConfig = namedtuple(
@@ -165,7 +183,27 @@ class ConfigManager(Manager):
 
     def __init__(self):
         super().__init__()
-        self._config_changed_connections = defaultdict(set)
+        self._config_changed_connections = {}
+        self._cache = threading.local()
+
+    def enable_cache(self):
+        """Cache the config values read by the current thread.
+
+        Until `disable_cache` is called, each config item is fetched from the
+        database at most once by this thread. Saving a config item evicts it
+        from the cache, and it is read from the database from then on: the
+        save may yet be rolled back, with its transaction or a savepoint.
+        """
+        self._cache.values = {}
+        self._cache.written = set()
+
+    def disable_cache(self):
+        """Stop caching config values for the current thread."""
+        self._cache.values = None
+        self._cache.written = None
+
+    def _get_cache(self):
+        return getattr(self._cache, "values", None)
 
     def get_config(self, name, default=None):
         """Return the config value corresponding to the given config name.
@@ -180,10 +218,22 @@ class ConfigManager(Manager):
         :return: A config value.
         :raises: Config.MultipleObjectsReturned
         """
-        try:
-            return self.get(name=name).value
-        except Config.DoesNotExist:
-            return copy.deepcopy(DEFAULT_CONFIG.get(name, default))
+        cache = self._get_cache()
+        if cache is not None and name in cache:
+            value = cache[name]
+        else:
+            try:
+                value = self.get(name=name).value
+            except Config.DoesNotExist:
+                value = _NOT_SET
+            if cache is not None and name not in self._cache.written:
+                cache[name] = value
+        if value is _NOT_SET:
+            return _copy_value(_get_default_config().get(name, default))
+        elif cache is not None:
+            return _copy_value(value)
+        else:
+            return value
 
     def get_configs(self, names, defaults=None):
         """Return the config values corresponding to the given config names.
@@ -199,13 +249,35 @@ class ConfigManager(Manager):
         """
         if defaults is None:
             defaults = [None for _ in range(len(names))]
-        configs = {
-            config.name: config for config in self.filter(name__in=names)
-        }
+        cache = self._get_cache()
+        if cache is None:
+            configs = dict(
+                self.filter(name__in=names).values_list("name", "value")
+            )
+        else:
+            values = {name: cache[name] for name in names if name in cache}
+            missing = [name for name in names if name not in values]
+            if missing:
+                fetched = dict.fromkeys(missing, _NOT_SET)
+                fetched.update(
+                    self.filter(name__in=missing).values_list("name", "value")
+                )
+                values.update(fetched)
+                written = self._cache.written
+                cache.update(
+                    (name, value)
+                    for name, value in fetched.items()
+                    if name not in written
+                )
+            configs = {
+                name: _copy_value(value)
+                for name, value in values.items()
+                if value is not _NOT_SET
+            }
         return {
-            name: configs.get(name).value
-            if configs.get(name)
-            else copy.deepcopy(DEFAULT_CONFIG.get(name, default))
+            name: configs[name]
+            if name in configs
+            else _copy_value(_get_default_config().get(name, default))
             for name, default in zip(names, defaults)
         }
 
@@ -221,9 +293,6 @@ class ConfigManager(Manager):
         :param request: The http request of the audit event to be created.
         :type request: HttpRequest object.
         """
-        # Avoid circular imports.
-        from maasserver.audit import create_audit_event
-
         config, freshly_created = self.get_or_create(
             name=name, defaults=dict(value=value)
         )
@@ -231,6 +300,9 @@ class ConfigManager(Manager):
             config.value = value
             config.save()
         if endpoint is not None and request is not None:
+            # Avoid circular imports.
+            from maasserver.audit import create_audit_event
+
             create_audit_event(
                 EVENT_TYPES.SETTINGS,
                 endpoint,
@@ -258,7 +330,9 @@ class ConfigManager(Manager):
           >>> Config.objects.config_changed_connect('config_name', callable)
 
         """
-        self._config_changed_connections[config_name].add(method)
+        self._config_changed_connections.setdefault(config_name, set()).add(
+            method
+        )
 
     def config_changed_disconnect(self, config_name, method):
         """Disconnect from Django's 'update' signal for given config name.
@@ -268,11 +342,20 @@ class ConfigManager(Manager):
         :param method: The method to be removed.
         :type method: callable
         """
-        self._config_changed_connections[config_name].discard(method)
+        connections = self._config_changed_connections.get(config_name)
+        if connections is not None:
+            connections.discard(method)
 
     def _config_changed(self, sender, instance, created, **kwargs):
-        for connection in self._config_changed_connections[instance.name]:
-            connection(sender, instance, created, **kwargs)
+        cache = self._get_cache()
+        if cache is not None:
+            cache.pop(instance.name, None)
+            self._cache.written.add(instance.name)
+        connections = self._config_changed_connections.get(instance.name)
+        if connections:
+            # Iterate over a snapshot, so connections can disconnect.
+            for connection in tuple(connections):
+                connection(sender, instance, created, **kwargs)
 
     def get_network_discovery_config_from_value(self, value):
         """Given the configuration value for `network_discovery`, return
@@ -6,9 +6,10 @@
 
 from socket import gethostname
 
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.http import HttpRequest
 from fixtures import TestWithFixtures
+from testtools import ExpectedException
 from testtools.matchers import Is
 
 from maasserver.enum import ENDPOINT_CHOICES
@@ -17,6 +18,7 @@ import maasserver.models.config
 from maasserver.models.config import get_default_config
 from maasserver.testing.factory import factory
 from maasserver.testing.testcase import MAASServerTestCase
+from maastesting.djangotestcase import count_queries
 from provisioningserver.events import AUDIT
 
 
@@ -33,6 +35,18 @@ class TestConfigDefault(MAASServerTestCase, TestWithFixtures):
         default_config = get_default_config()
         self.assertEqual("3", default_config["maas_auto_ipmi_cipher_suite_id"])
 
+    def test_default_config_computed_on_first_use(self):
+        module = maasserver.models.config
+        module._get_default_config.cache_clear()
+        self.addCleanup(module._get_default_config.cache_clear)
+        get_default_config = self.patch(module, "get_default_config")
+        get_default_config.return_value = {"name": "value"}
+        self.assertEqual("value", Config.objects.get_config("name"))
+        self.assertEqual(
+            {"name": "value"}, Config.objects.get_configs(["name"])
+        )
+        get_default_config.assert_called_once_with()
+
     def test_defaults(self):
         expected = get_default_config()
         observed = {name: Config.objects.get_config(name) for name in expected}
@@ -95,7 +109,11 @@ class TestConfig(MAASServerTestCase):
     def test_manager_get_config_not_found_in_default_config(self):
         name = factory.make_string()
         value = factory.make_string()
-        self.patch(maasserver.models.config, "DEFAULT_CONFIG", {name: value})
+        self.patch(
+            maasserver.models.config,
+            "_get_default_config",
+            lambda: {name: value},
+        )
         config = Config.objects.get_config(name, None)
         self.assertEqual(value, config)
 
@@ -103,14 +121,26 @@ class TestConfig(MAASServerTestCase):
         name = factory.make_string()
         self.patch(
             maasserver.models.config,
-            "DEFAULT_CONFIG",
-            {name: {"key": "value"}},
+            "_get_default_config",
+            lambda: {name: {"key": "value"}},
         )
         config = Config.objects.get_config(name)
         config.update({"key2": "value2"})
 
         self.assertEqual({"key": "value"}, Config.objects.get_config(name))
 
+    def test_get_configs_default_config_cannot_be_changed(self):
+        name = factory.make_string()
+        self.patch(
+            maasserver.models.config,
+            "_get_default_config",
+            lambda: {name: {"key": "value"}},
+        )
+        config = Config.objects.get_configs([name])[name]
+        config.update({"key2": "value2"})
+
+        self.assertEqual({"key": "value"}, Config.objects.get_config(name))
+
     def test_manager_get_configs_returns_configs_dict(self):
         expected = get_default_config()
         # Only get a subset of all the configs.
@@ -219,6 +249,32 @@ class TestConfig(MAASServerTestCase):
 
         self.assertEqual([], recorder.calls)
 
+    def test_manager_config_changed_disconnect_unknown_name(self):
+        Config.objects.config_changed_disconnect(
+            factory.make_string(), CallRecorder()
+        )
+
+    def test_manager_config_changed_connection_can_disconnect(self):
+        name = factory.make_string()
+        recorder = CallRecorder()
+
+        def disconnect(*args, **kwargs):
+            Config.objects.config_changed_disconnect(name, disconnect)
+
+        Config.objects.config_changed_connect(name, disconnect)
+        Config.objects.config_changed_connect(name, recorder)
+        self.addCleanup(
+            Config.objects.config_changed_disconnect, name, recorder
+        )
+        Config.objects.set_config(name, factory.make_string())
+
+        self.assertEqual(1, len(recorder.calls))
+
+    def test_manager_config_changed_does_not_track_unconnected_names(self):
+        name = factory.make_string()
+        Config.objects.set_config(name, factory.make_string())
+        self.assertNotIn(name, Config.objects._config_changed_connections)
+
     def test_manager_is_external_auth_enabled_false(self):
         self.assertFalse(Config.objects.is_external_auth_enabled())
 
@@ -229,6 +285,93 @@ class TestConfig(MAASServerTestCase):
         self.assertTrue(Config.objects.is_external_auth_enabled())
 
 
+class TestConfigCache(MAASServerTestCase):
+    def setUp(self):
+        super().setUp()
+        Config.objects.enable_cache()
+        self.addCleanup(Config.objects.disable_cache)
+
+    def make_config(self, name, value):
+        """Save a config item before the cache's lifetime."""
+        Config.objects.disable_cache()
+        Config.objects.set_config(name, value)
+        Config.objects.enable_cache()
+
+    def test_get_config_queries_once(self):
+        self.make_config("name", "value")
+        Config.objects.get_config("name")
+        count, value = count_queries(Config.objects.get_config, "name")
+        self.assertEqual(0, count)
+        self.assertEqual("value", value)
+
+    def test_get_config_caches_missing_config(self):
+        Config.objects.get_config("name", "default")
+        count, value = count_queries(
+            Config.objects.get_config, "name", "other"
+        )
+        self.assertEqual(0, count)
+        self.assertEqual("other", value)
+
+    def test_get_config_returns_copy(self):
+        self.make_config("name", {"key": "value"})
+        Config.objects.get_config("name").update({"key2": "value2"})
+        self.assertEqual({"key": "value"}, Config.objects.get_config("name"))
+
+    def test_get_configs_uses_cache(self):
+        self.make_config("name", "value")
+        Config.objects.get_config("name")
+        Config.objects.get_config("other", "default")
+        count, configs = count_queries(
+            Config.objects.get_configs, ["name", "other"], [None, "default"]
+        )
+        self.assertEqual(0, count)
+        self.assertEqual({"name": "value", "other": "default"}, configs)
+
+    def test_get_configs_fills_cache(self):
+        self.make_config("name", "value")
+        Config.objects.get_configs(["name", "other"])
+        count, value = count_queries(Config.objects.get_config, "name")
+        self.assertEqual(0, count)
+        self.assertEqual("value", value)
+
+    def test_set_config_evicts_cached_value(self):
+        Config.objects.set_config("name", "value")
+        Config.objects.get_config("name")
+        Config.objects.set_config("name", "other")
+        self.assertEqual("other", Config.objects.get_config("name"))
+
+    def test_saved_config_is_not_cached(self):
+        Config.objects.set_config("name", "value")
+        Config.objects.get_config("name")
+        Config.objects.get_configs(["name"])
+        count, value = count_queries(Config.objects.get_config, "name")
+        self.assertEqual(1, count)
+        self.assertEqual("value", value)
+
+    def test_rolled_back_config_is_not_served_from_cache(self):
+        self.make_config("name", "value")
+        Config.objects.get_config("name")
+
+        class Rollback(Exception):
+            """Raised to roll back the transaction."""
+
+        with ExpectedException(Rollback):
+            with transaction.atomic():
+                Config.objects.set_config("name", "other")
+                self.assertEqual("other", Config.objects.get_config("name"))
+                raise Rollback()
+        self.assertEqual("value", Config.objects.get_config("name"))
+        self.assertEqual(
+            {"name": "value"}, Config.objects.get_configs(["name"])
+        )
+
+    def test_disable_cache_stops_caching(self):
+        Config.objects.disable_cache()
+        Config.objects.get_config("name")
+        count, _ = count_queries(Config.objects.get_config, "name")
+        self.assertEqual(1, count)
+
+
 class TestSettingConfig(MAASServerTestCase):
     """Testing of the :class:`Config` model and setting each option."""
 
@@ -21,6 +21,8 @@ def fix_ordereddict_yaml_representer():
 
     yaml.add_representer(OrderedDict, dumper, Dumper=yaml.Dumper)
     yaml.add_representer(OrderedDict, dumper, Dumper=yaml.SafeDumper)
+    if hasattr(yaml, "CSafeDumper"):
+        yaml.add_representer(OrderedDict, dumper, Dumper=yaml.CSafeDumper)
 
 
 def add_patches():
@@ -305,6 +305,21 @@ class TestJSONObjectField(MAASLegacyServerTestCase):
             test_instance = JSONFieldModel.objects.get(name=name)
             self.assertEqual(value, test_instance.value)
 
+    def test_to_python_decodes_values_rejected_by_orjson(self):
+        field = JSONObjectField()
+        self.assertEqual(float("inf"), field.to_python("Infinity"))
+        self.assertEqual([1, float("-inf")], field.to_python("[1, -Infinity]"))
+
+    def test_big_integers_read_back_unchanged(self):
+        value = [2**64, -(2**63) - 1]
+        JSONFieldModel.objects.create(name="big", value=value)
+        test_instance = JSONFieldModel.objects.get(name="big")
+        self.assertEqual(value, test_instance.value)
+        self.assertIsInstance(test_instance.value[0], int)
+
+    def test_to_python_returns_invalid_json_unchanged(self):
+        self.assertEqual("{invalid", JSONObjectField().to_python("{invalid"))
+
     def test_field_exact_lookup(self):
         # Value can be query via an 'exact' lookup.
         obj = [4, 6, {}]
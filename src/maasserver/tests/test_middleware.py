@@ -25,6 +25,7 @@ from maasserver.exceptions import MAASAPIException, MAASAPINotFound
 from maasserver.middleware import (
     AccessMiddleware,
     APIRPCErrorsMiddleware,
+    ConfigCacheMiddleware,
     CSRFHelperMiddleware,
     DebuggingLoggerMiddleware,
     ExceptionMiddleware,
@@ -722,3 +723,31 @@ class TestRBACMiddleware(MAASServerTestCase):
         request = factory.make_fake_request(factory.make_string(), "GET")
         self.process_request(request)
         self.assertThat(mock_clear, MockCalledOnceWith())
+
+
+class TestConfigCacheMiddleware(MAASServerTestCase):
+    def process_request(self, request, get_response):
+        middleware = ConfigCacheMiddleware(get_response)
+        return middleware(request)
+
+    def test_caches_config_during_request(self):
+        def get_response(request):
+            self.assertIsNotNone(Config.objects._get_cache())
+
+        request = factory.make_fake_request(factory.make_string(), "GET")
+        self.process_request(request, get_response)
+
+    def test_disables_cache_after_request(self):
+        request = factory.make_fake_request(factory.make_string(), "GET")
+        self.process_request(request, lambda request: None)
+        self.assertIsNone(Config.objects._get_cache())
+
+    def test_disables_cache_on_error(self):
+        def get_response(request):
+            raise ValueError()
+
+        request = factory.make_fake_request(factory.make_string(), "GET")
+        self.assertRaises(
+            ValueError, self.process_request, request, get_response
+        )
+        self.assertIsNone(Config.objects._get_cache())
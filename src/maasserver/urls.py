@@ -5,11 +5,11 @@
 
 
 from django.http import HttpResponse
-from django.urls import include, re_path
+from django.urls import include, path, re_path
 from django.views.generic import TemplateView
 
 from maasserver import urls_api
-from maasserver.api.doc_oapi import landing_page, openapi_docs_context
+from maasserver.api.doc_oapi import landing_page, OpenAPIDocsView
 from maasserver.bootresources import (
     simplestreams_file_handler,
     simplestreams_stream_handler,
@@ -21,12 +21,12 @@ from maasserver.views.account import authenticate, csrf, login, logout
 from maasserver.views.rpc import info
 from maasserver.views.vmhost import vmhost_certificate_handler
 
-# Anonymous views.
 urlpatterns = [
-    re_path(r"^accounts/login/$", login, name="login"),
-    re_path(r"^accounts/authenticate/$", authenticate, name="authenticate"),
-    re_path(
-        r"^accounts/discharge-request/$",
+    # Anonymous views.
+    path("accounts/login/", login, name="login"),
+    path("accounts/authenticate/", authenticate, name="authenticate"),
+    path(
+        "accounts/discharge-request/",
         MacaroonDischargeRequest(),
         name="discharge-request",
     ),
@@ -41,22 +41,22 @@ urlpatterns = [
         simplestreams_file_handler,
         name="simplestreams_file_handler",
     ),
-    re_path(
-        r"^maas-run-scripts$",
+    path(
+        "maas-run-scripts",
         TemplateView.as_view(
             template_name="maas_run_scripts.template",
             content_type="text/x-python",
         ),
         name="maas-run-scripts",
     ),
-    re_path(r"^metrics$", prometheus_stats_handler, name="metrics"),
-    re_path(
-        r"^metrics/endpoints$",
+    path("metrics", prometheus_stats_handler, name="metrics"),
+    path(
+        "metrics/endpoints",
         prometheus_discovery_handler,
         name="metrics_endpoints",
     ),
-    re_path(
-        r"^robots\.txt$",
+    path(
+        "robots.txt",
         TemplateView.as_view(
             template_name="robots.txt", content_type="text/plain"
         ),
@@ -67,25 +67,16 @@ urlpatterns = [
         vmhost_certificate_handler,
         name="vmhost-certificate",
     ),
-]
-
-# # URLs for logged-in users.
-# Preferences views.
-urlpatterns += [re_path(r"^account/csrf/$", csrf, name="csrf")]
-# Logout view.
-urlpatterns += [re_path(r"^accounts/logout/$", logout, name="logout")]
-
-# API URLs. If old API requested, provide error message directing to new API.
-urlpatterns += [
-    re_path(r"^api/$", landing_page),
-    re_path(
-        r"^api/docs/",
-        lambda request: TemplateView.as_view(
-            template_name="openapi.html",
-            extra_context=openapi_docs_context(request),
-        ),
-    ),
-    re_path(r"^api/2\.0/", include(urls_api)),
+    # # URLs for logged-in users.
+    # Preferences views.
+    path("account/csrf/", csrf, name="csrf"),
+    # Logout view.
+    path("accounts/logout/", logout, name="logout"),
+    # API URLs. If old API requested, provide error message directing to new
+    # API.
+    path("api/", landing_page),
+    re_path(r"^api/docs/", OpenAPIDocsView.as_view(), name="api_docs"),
+    path("api/2.0/", include(urls_api)),
     re_path(
         r"^api/version/",
         lambda request: HttpResponse(content="2.0", content_type="text/plain"),
@@ -101,8 +92,6 @@ urlpatterns += [
         ),
         name="api_v1_error",
     ),
+    # RPC URLs.
+    path("rpc/", info, name="rpc-info"),
 ]
-
-
-# RPC URLs.
-urlpatterns += [re_path(r"^rpc/$", info, name="rpc-info")]
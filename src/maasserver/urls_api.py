@@ -39,7 +39,7 @@ from maasserver.api.dnsresourcerecords import (
 )
 from maasserver.api.dnsresources import DNSResourceHandler, DNSResourcesHandler
 from maasserver.api.doc_handler import describe
-from maasserver.api.doc_oapi import endpoint
+from maasserver.api.doc_oapi import endpoint, json_endpoint
 from maasserver.api.domains import DomainHandler, DomainsHandler
 from maasserver.api.events import EventsHandler
 from maasserver.api.fabrics import FabricHandler, FabricsHandler
@@ -355,6 +355,7 @@ patterns = [
     re_path(r"describe/$", describe, name="describe"),
     re_path(r"version/$", version_handler, name="version_handler"),
     re_path(r"openapi.yaml$", endpoint, name="openapi_endpoint"),
+    re_path(r"openapi.json$", json_endpoint, name="openapi_json_endpoint"),
 ]
 
 
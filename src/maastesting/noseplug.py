@@ -269,13 +269,25 @@ class Select(Plugin):
         return inspect.getdoc(self)
 
 
+def _get_test_class_id(test):
+    """Return the ID of the class of `test`, derived from the test's ID.
+
+    Scenario names, in parentheses, are ignored. IDs without a class part
+    are returned whole.
+    """
+    test_id = test.id().split("(", 1)[0]
+    return test_id.rpartition(".")[0] or test_id
+
+
 class SelectBucket(Plugin):
     """Select tests from buckets derived from their names.
 
-    Each test's ID is hashed into a number. This number, modulo the given
-    number of "buckets", defines the "bucket" for the test. This bucket can
-    then be selected by an option. This gives a caller a rough but stable way
-    to split up a test suite into parts, for running in parallel perhaps.
+    The ID of each test's class is hashed into a number. This number, modulo
+    the given number of "buckets", defines the "bucket" for the test. This
+    bucket can then be selected by an option. This gives a caller a rough but
+    stable way to split up a test suite into parts, for running in parallel
+    perhaps. Keeping the tests of a class in the same bucket means that any
+    class-level set-up is done once, not once per bucket.
 
     Note that, when using this plug-in, the nose-progressive plug-in will be
     inoperative. Both this and nose-progressive attempt to customise the test
@@ -334,7 +346,7 @@ class SelectBucket(Plugin):
                 bucket, buckets = bucket_buckets
                 offset = bucket - 1  # Zero-based bucket number.
                 self._selectTest = lambda test: (
-                    sum(map(ord, test.id())) % buckets == offset
+                    sum(map(ord, _get_test_class_id(test))) % buckets == offset
                 )
 
     def _ingestSelectedBucket(self, option, option_string, value, parser):
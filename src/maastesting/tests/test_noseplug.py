@@ -466,6 +466,34 @@ class TestSelectBucket(MAASTestCase):
         self.assertThat({t.id() for t in runner_orig.test}, Equals({"H"}))
         self.assertThat(ord("H") % 13, Equals(7))
 
+    def test_prepareTestRunner_keeps_tests_of_a_class_together(self):
+        select = SelectBucket()
+        parser = OptionParser()
+        select.add_options(parser=parser, env={})
+        options, rest = parser.parse_args(
+            ["--with-select-bucket", "--select-bucket", "1/2"]
+        )
+        select.configure(options, sentinel.conf)
+        # "a.B" and "a.C" fall into different buckets.
+        test_ids = [
+            "a.B.test_one",
+            "a.B.test_two(scenario.with.dots)",
+            "a.C.test_one",
+            "a.C.test_two",
+        ]
+        test = unittest.TestSuite(map(self._make_test_with_id, test_ids))
+
+        class MockTestRunner:
+            def run(self, test):
+                self.test = test
+
+        runner_orig = MockTestRunner()
+        select.prepareTestRunner(runner_orig).run(test)
+        self.assertEqual(
+            {"a.C.test_one", "a.C.test_two"},
+            {t.id() for t in runner_orig.test},
+        )
+
     def test_prepareTestRunner_does_nothing_when_no_bucket_selected(self):
         select = SelectBucket()
         parser = OptionParser()
@@ -26,7 +26,6 @@ from provisioningserver.utils.debug import (
     register_sigusr1_toggle_cprofile,
     register_sigusr2_thread_dump_handler,
 )
-from provisioningserver.utils.twisted import retries
 
 
 class Options(logger.VerbosityOptions):
@@ -242,8 +241,14 @@ class ProvisioningServiceMaker:
         # Get something going with the logs.
         logger.configure(verbosity, logger.LoggingMode.TWISTD)
 
-    def makeService(self, options, clock=reactor, sleep=sleep):
-        """Construct the MAAS Cluster service."""
+    def makeService(
+        self, options, clock=reactor, sleep=sleep, max_attempts=300
+    ):
+        """Construct the MAAS Cluster service.
+
+        :param max_attempts: How many times to look for the shared secret, a
+            second apart, before giving up on making the services.
+        """
         register_sigusr1_toggle_cprofile("rackd")
         register_sigusr2_thread_dump_handler()
         clean_prometheus_dir()
@@ -264,12 +269,12 @@ class ProvisioningServiceMaker:
 
         from provisioningserver import services
 
-        secret = None
-        for elapsed, remaining, wait in retries(timeout=5 * 60, clock=clock):
-            secret = get_shared_secret_from_filesystem()
+        secret = get_shared_secret_from_filesystem()
+        for _ in range(max_attempts - 1):
             if secret is not None:
                 break
-            sleep(wait)
+            sleep(1)
+            secret = get_shared_secret_from_filesystem()
         if secret is not None:
             # only setup services if the shared secret is configured
             for service in self._makeServices(
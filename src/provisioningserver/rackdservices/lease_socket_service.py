@@ -5,7 +5,6 @@
 
 
 from collections import deque
-import json
 import os
 
 from twisted.application.service import Service
@@ -17,6 +16,7 @@ from provisioningserver.logger import get_maas_logger
 from provisioningserver.path import get_maas_data_path
 from provisioningserver.rpc.exceptions import NoConnectionsAvailable
 from provisioningserver.rpc.region import UpdateLease
+from provisioningserver.utils.json import json_loads
 from provisioningserver.utils.twisted import pause, retries
 
 maaslog = get_maas_logger("lease_socket_service")
@@ -73,9 +73,10 @@ class LeaseSocketService(Service, DatagramProtocol):
         The packet is converted from JSON then placed in a queue to be sent to
         the region controller for processing.
         """
-        # If this fails to convert, twisted will handle this gracefully and
-        # not cause the reactor to crash.
-        notification = json.loads(data.decode("utf-8"))
+        # json_loads() parses the UTF-8 bytes directly, without making a str
+        # copy. If this fails to convert, twisted will handle this gracefully
+        # and not cause the reactor to crash.
+        notification = json_loads(data)
 
         # Place the notification into the list of notifications and the looping
         # call will handle sending the notification to the region. This ensures
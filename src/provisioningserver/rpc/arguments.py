@@ -6,6 +6,8 @@
 from collections.abc import Mapping
 import importlib
 import json
+from operator import itemgetter
+import struct
 import urllib.parse
 import zlib
 
@@ -86,8 +88,12 @@ class ParsedURL(amp.Argument):
             geturl = inObject.geturl
         except AttributeError:
             raise TypeError(f"Not a URL-like object: {inObject!r}")
-        else:
-            return ascii_url(geturl())
+        url = geturl()
+        try:
+            # Most URLs are ASCII already, with nothing to encode to IDNA.
+            return url.encode("ascii")
+        except UnicodeEncodeError:
+            return ascii_url(url)
 
     def fromString(self, inString):
         """Decode an ASCII URL into a URL-like object.
@@ -149,6 +155,10 @@ def _toByteString(string):
         return string
 
 
+_pack_length = struct.Struct("!H").pack
+_END_OF_BOX = _pack_length(0)
+
+
 class AmpList(amp.AmpList):
     """An :py:class:`amp.AmpList` that works with native string arguments.
 
@@ -168,6 +178,66 @@ class AmpList(amp.AmpList):
         """
         subargs = tuple((_toByteString(name), arg) for name, arg in subargs)
         super().__init__(subargs, optional)
+        self._keys = tuple(
+            amp._wireNameToPythonIdentifier(name) for name, _ in subargs
+        )
+        # Plan the serialisation of each box up-front: the length-prefixed
+        # wire name, the Python name and the position in the schema of each
+        # field, in the sorted order in which `amp.Box.serialize` emits
+        # them. This is only possible when every argument uses the default
+        # `toBox`.
+        if all(type(arg).toBox is amp.Argument.toBox for _, arg in subargs):
+            self._fields = tuple(
+                (_pack_length(len(name)) + name, key, index, arg)
+                for (name, arg), key, index in sorted(
+                    zip(subargs, self._keys, range(len(subargs))),
+                    key=itemgetter(0),
+                )
+            )
+        else:
+            self._fields = None
+
+    def toStringProto(self, inObject, proto):
+        """Serialise `inObject` in a single pass.
+
+        Each element of `inObject` can be a mapping, or a tuple of values in
+        the order of the schema given to the constructor. Optional values in
+        a tuple can be `None`.
+
+        This produces exactly what ``amp.AmpList`` does, without building
+        and sorting an ``amp.Box`` for every element.
+        """
+        if self._fields is None:
+            return super().toStringProto(
+                [
+                    dict(zip(self._keys, objects))
+                    if isinstance(objects, tuple)
+                    else objects
+                    for objects in inObject
+                ],
+                proto,
+            )
+        chunks = []
+        append = chunks.append
+        for objects in inObject:
+            positional = isinstance(objects, tuple)
+            for prefix, key, index, argument in self._fields:
+                if positional:
+                    obj = objects[index]
+                elif argument.optional:
+                    obj = objects.get(key)
+                else:
+                    obj = objects[key]
+                if obj is None and argument.optional:
+                    continue
+                value = argument.toStringProto(obj, proto)
+                if len(value) > amp.MAX_VALUE_LENGTH:
+                    raise amp.TooLong(False, True, value, prefix[2:])
+                append(prefix)
+                append(_pack_length(len(value)))
+                append(value)
+            append(_END_OF_BOX)
+        return b"".join(chunks)
 
 
 class CompressedAmpList(AmpList):
@@ -176,11 +246,21 @@ class CompressedAmpList(AmpList):
     The serialised form is transparently compressed and decompressed with
     zlib. This can be useful when there's a lot of repetition in the list
     being transmitted.
+
+    Serialised forms smaller than `min_compressed_size` are not worth
+    compressing, so they are stored in zlib's format without compression.
+    Peers decode these exactly like compressed ones.
     """
 
+    min_compressed_size = 512
+
     def toStringProto(self, inObject, proto):
         toStringProto = super().toStringProto
-        return zlib.compress(toStringProto(inObject, proto))
+        encoded = toStringProto(inObject, proto)
+        if len(encoded) < self.min_compressed_size:
+            return zlib.compress(encoded, 0)
+        else:
+            return zlib.compress(encoded)
 
     def fromStringProto(self, inString, proto):
         fromStringProto = super().fromStringProto
@@ -188,11 +268,15 @@ class CompressedAmpList(AmpList):
 
 
 class IPAddress(amp.Argument):
-    """Encode a `netaddr.IPAddress` object on the wire."""
+    """Encode a `netaddr.IPAddress` object on the wire.
+
+    Addresses from the standard library's `ipaddress` module can be encoded
+    too, but are always decoded as `netaddr.IPAddress`.
+    """
 
     def toString(self, inObject):
         length = 4 if inObject.version == 4 else 16
-        return inObject.value.to_bytes(length, "big")
+        return int(inObject).to_bytes(length, "big")
 
     def fromString(self, inString):
         address = int.from_bytes(inString, "big")
@@ -4,6 +4,7 @@
 """Test AMP argument classes."""
 
 
+import ipaddress
 import random
 import zlib
 
@@ -93,6 +94,17 @@ class TestAttrsClassArgument(MAASTestCase):
         decoded = argument.fromString(encoded)
         self.assertEqual(decoded, sample)
 
+    def test_class_is_resolved_only_at_construction(self):
+        get_class = self.patch(arguments.AttrsClassArgument, "_get_class")
+        get_class.return_value = SampleAttrs
+        argument = arguments.AttrsClassArgument("SampleAttrs")
+        get_class.assert_called_once_with("SampleAttrs")
+        sample = SampleAttrs(foo="foo", bar=10)
+        self.assertEqual(
+            sample, argument.fromString(argument.toString(sample))
+        )
+        get_class.assert_called_once_with("SampleAttrs")
+
 
 class TestParsedURL(MAASTestCase):
     def test_round_trip(self):
@@ -107,6 +119,14 @@ class TestParsedURL(MAASTestCase):
         with ExpectedException(TypeError, "^Not a URL-like object: <.*"):
             arguments.ParsedURL().toString(object())
 
+    def test_ascii_url_is_encoded_without_idna(self):
+        argument = arguments.ParsedURL()
+        example = factory.make_parsed_url()
+        ascii_url = self.patch(arguments, "ascii_url")
+        encoded = argument.toString(example)
+        self.assertEqual(example.geturl().encode("ascii"), encoded)
+        ascii_url.assert_not_called()
+
     def test_netloc_containing_non_ascii_characters_is_encoded_to_idna(self):
         argument = arguments.ParsedURL()
         example = factory.make_parsed_url()._replace(
@@ -129,8 +149,64 @@ class TestAmpList(MAASTestCase):
         decoded = argument.fromStringProto(encoded, proto=None)
         self.assertEqual(example, decoded)
 
+    def test_serialises_exactly_like_amp_AmpList(self):
+        subargs = [
+            (b"thing", amp.Unicode()),
+            (b"a-number", amp.Integer()),
+            (b"maybe", amp.Unicode(optional=True)),
+        ]
+        example = [
+            {"thing": factory.make_name("thing"), "a_number": 1},
+            {"thing": factory.make_name("thing"), "a_number": 2, "maybe": "x"},
+        ]
+        self.assertEqual(
+            amp.AmpList(subargs).toStringProto(example, proto=None),
+            arguments.AmpList(subargs).toStringProto(example, proto=None),
+        )
+
+    def test_tuples_may_omit_optional_values(self):
+        argument = arguments.AmpList(
+            [(b"thing", amp.Unicode()), (b"maybe", amp.Unicode(optional=True))]
+        )
+        self.assertEqual(
+            argument.toStringProto([{"thing": "a"}], proto=None),
+            argument.toStringProto([("a", None)], proto=None),
+        )
+
+    def test_missing_required_field_is_an_error(self):
+        argument = arguments.AmpList([(b"thing", amp.Unicode())])
+        self.assertRaises(KeyError, argument.toStringProto, [{}], proto=None)
+
+    def test_value_too_long_is_an_error(self):
+        argument = arguments.AmpList([(b"thing", amp.Unicode())])
+        example = [{"thing": "x" * (amp.MAX_VALUE_LENGTH + 1)}]
+        self.assertRaises(
+            amp.TooLong, argument.toStringProto, example, proto=None
+        )
+
 
 class TestCompressedAmpList(MAASTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Create 3500 leases, once for the whole class. We can get up to
+        # ~3750 and still satisfy the post-conditions, but the randomness
+        # means we can't be sure about test stability that close to the
+        # limit. This runs before any test seeds `random`, so the leases
+        # come from a generator of their own with a fixed seed.
+        rng = random.Random(3500)
+
+        def make_octets(count):
+            return [rng.randrange(256) for _ in range(count)]
+
+        cls.leases = [
+            (
+                "%d.%d.%d.%d" % (rng.randrange(1, 256), *make_octets(3)),
+                ":".join(format(octet, "02x") for octet in make_octets(6)),
+            )
+            for _ in range(3500)
+        ]
+
     def test_round_trip(self):
         argument = arguments.CompressedAmpList([("thing", amp.Unicode())])
         example = [{"thing": factory.make_name("thing")}]
@@ -139,21 +215,40 @@ class TestCompressedAmpList(MAASTestCase):
         decoded = argument.fromStringProto(encoded, proto=None)
         self.assertEqual(example, decoded)
 
+    def test_small_lists_are_stored_without_compression(self):
+        argument = arguments.CompressedAmpList([("thing", amp.Unicode())])
+        example = [{"thing": "thing" * 10}, {"thing": "thing" * 10}]
+        encoded = argument.toStringProto(example, proto=None)
+        encoded_uncompressed = zlib.decompress(encoded)
+        self.assertLess(
+            len(encoded_uncompressed), argument.min_compressed_size
+        )
+        self.assertEqual(zlib.compress(encoded_uncompressed, 0), encoded)
+        decoded = argument.fromStringProto(encoded, proto=None)
+        self.assertEqual(example, decoded)
+
+    def test_tuples_are_encoded_like_mappings(self):
+        argument = arguments.CompressedAmpList(
+            [("ip", amp.Unicode()), ("mac", amp.Unicode())]
+        )
+        leases = self.leases[:100]
+        encoded = argument.toStringProto(leases, proto=None)
+        self.assertEqual(
+            argument.toStringProto(
+                [{"ip": ip, "mac": mac} for ip, mac in leases], proto=None
+            ),
+            encoded,
+        )
+        self.assertEqual(
+            [{"ip": ip, "mac": mac} for ip, mac in leases],
+            argument.fromStringProto(encoded, proto=None),
+        )
+
     def test_compression_is_worth_it(self):
         argument = arguments.CompressedAmpList(
             [("ip", amp.Unicode()), ("mac", amp.Unicode())]
         )
-        # Create 3500 leases. We can get up to ~3750 and still satisfy the
-        # post-conditions, but the randomness means we can't be sure about
-        # test stability that close to the limit.
-        leases = [
-            {
-                "ip": factory.make_ipv4_address(),
-                "mac": factory.make_mac_address(),
-            }
-            for _ in range(3500)
-        ]
-        encoded_compressed = argument.toStringProto(leases, proto=None)
+        encoded_compressed = argument.toStringProto(self.leases, proto=None)
         encoded_uncompressed = zlib.decompress(encoded_compressed)
         # The encoded leases compress to less than half the size of the
         # uncompressed leases, and under the AMP message limit of 64k.
@@ -191,6 +286,13 @@ class TestIPAddress(MAASTestCase):
         decoded = self.argument.fromString(encoded)
         self.assertThat(decoded, Equals(address))
 
+    def test_encodes_stdlib_addresses_like_netaddr_addresses(self):
+        for address in ("192.168.34.87", "fd28:8d1a:6c8e::345"):
+            self.assertEqual(
+                self.argument.toString(netaddr.IPAddress(address)),
+                self.argument.toString(ipaddress.ip_address(address)),
+            )
+
 
 class TestIPNetwork(MAASTestCase):
 
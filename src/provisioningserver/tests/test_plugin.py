@@ -4,31 +4,19 @@
 """Tests for the ``maasrackd`` TAP."""
 
 
-from itertools import count
+from contextlib import ExitStack
 import os
-from pathlib import Path
-from subprocess import Popen
+from unittest import mock
 
 import crochet
 from fixtures import EnvironmentVariable
-from testtools.matchers import (
-    AfterPreprocessing,
-    Contains,
-    Equals,
-    IsInstance,
-    KeysEqual,
-    MatchesAll,
-    MatchesStructure,
-    Not,
-)
 from twisted.application.internet import StreamServerEndpointService
 from twisted.application.service import MultiService
 from twisted.internet.task import Clock
 
-from maastesting import get_testing_timeout
-from maastesting.fixtures import TempDirectory
-from maastesting.matchers import MockCalledOnceWith
-from maastesting.testcase import MAASTestCase, MAASTwistedRunTest
+from maastesting.factory import factory
+from maastesting.fixtures import MAASDataFixture, MAASRootFixture
+from maastesting.testcase import MAASTestCase
 import provisioningserver
 from provisioningserver import logger
 from provisioningserver import plugin as plugin_module
@@ -62,6 +50,25 @@ from provisioningserver.rackdservices.version_update_check import (
 from provisioningserver.rpc.clusterservice import ClusterClientCheckerService
 from provisioningserver.testing.config import ClusterConfigurationFixture
 
+# The services that rackd runs by default.
+EXPECTED_SERVICE_NAMES = frozenset(
+    {
+        "dhcp_probe",
+        "networks_monitor",
+        "image_download",
+        "lease_socket_service",
+        "node_monitor",
+        "external",
+        "rpc",
+        "rpc-ping",
+        "http",
+        "http_service",
+        "tftp",
+        "service_monitor",
+        "version_update_check",
+    }
+)
+
 
 class TestOptions(MAASTestCase):
     """Tests for `provisioningserver.plugin.Options`."""
@@ -80,19 +87,32 @@ class TestOptions(MAASTestCase):
 class TestProvisioningServiceMaker(MAASTestCase):
     """Tests for `provisioningserver.plugin.ProvisioningServiceMaker`."""
 
-    run_tests_with = MAASTwistedRunTest.make_factory(
-        timeout=get_testing_timeout()
-    )
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The cluster configuration is only read, so all the tests can share
+        # one, though they may install their own over it. Auto-speccing is
+        # costly, so these are patched once for the class and reset before
+        # each test.
+        cls.class_patches = ExitStack()
+        cls.class_patches.enter_context(ClusterConfigurationFixture())
+        cls.mock_no_setup = cls.class_patches.enter_context(
+            mock.patch.object(crochet, "no_setup", autospec=True)
+        )
+        cls.mock_configure = cls.class_patches.enter_context(
+            mock.patch.object(logger, "configure", autospec=True)
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.class_patches.close()
+        super().tearDownClass()
 
     def setUp(self):
         super().setUp()
-        self.useFixture(ClusterConfigurationFixture())
+        self.mock_no_setup.reset_mock()
+        self.mock_configure.reset_mock()
         self.patch(provisioningserver, "services", MultiService())
-        self.patch_autospec(crochet, "no_setup")
-        self.patch_autospec(logger, "configure")
-        self.mock_generate_certificate = self.patch(
-            plugin_module, "generate_certificate_if_needed"
-        )
         # by default, define a shared secret so that sevices are populated
         self.mock_get_shared_secret = self.patch(
             plugin_module, "get_shared_secret_from_filesystem"
@@ -101,9 +121,11 @@ class TestProvisioningServiceMaker(MAASTestCase):
 
     def get_unused_pid(self):
         """Return a PID for a process that has just finished running."""
-        proc = Popen(["/bin/true"])
-        proc.wait()
-        return proc.pid
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0)
+        os.waitpid(pid, 0)
+        return pid
 
     def test_init(self):
         service_maker = ProvisioningServiceMaker("Harry", "Hill")
@@ -115,21 +137,14 @@ class TestProvisioningServiceMaker(MAASTestCase):
         service_maker = ProvisioningServiceMaker("foo", "bar")
         self.patch(service_maker, "_loadSettings")
         clock = Clock()
-
-        attempts = count()
-
-        def advance(seconds):
-            next(attempts)
-            clock.advance(seconds)
-
         service = service_maker.makeService(
-            Options(), clock=clock, sleep=advance
+            Options(), clock=clock, sleep=clock.advance, max_attempts=5
         )
         self.assertIsInstance(service, MultiService)
         self.assertEqual(service.namedServices, {})
-        self.mock_generate_certificate.assert_not_called()
-        # All 300 attempts (e.g. 5 minutes) fail, next is 301
-        self.assertEqual(next(attempts), 301)
+        # All 5 attempts fail, a second apart.
+        self.assertEqual(self.mock_get_shared_secret.call_count, 5)
+        self.assertEqual(clock.seconds(), 4)
 
     def test_makeService_eventual_shared_secret(self):
         # First two times we look, there's no secret
@@ -137,20 +152,14 @@ class TestProvisioningServiceMaker(MAASTestCase):
         service_maker = ProvisioningServiceMaker("foo", "bar")
         self.patch(service_maker, "_loadSettings")
         clock = Clock()
-
-        attempts = count(1)
-
-        def advance(seconds):
-            next(attempts)
-            clock.advance(60)
-
         service = service_maker.makeService(
-            Options(), clock=clock, sleep=advance
+            Options(), clock=clock, sleep=clock.advance, max_attempts=5
         )
         self.assertIsInstance(service, MultiService)
         self.assertNotEqual(service.namedServices, {})
         # First two fail, the third one succeeds
-        self.assertEqual(next(attempts), 3)
+        self.assertEqual(self.mock_get_shared_secret.call_count, 3)
+        self.assertEqual(clock.seconds(), 2)
 
     def test_makeService_not_in_debug(self):
         """
@@ -162,34 +171,16 @@ class TestProvisioningServiceMaker(MAASTestCase):
         self.patch(service_maker, "_loadSettings")
         service = service_maker.makeService(options, clock=None)
         self.assertIsInstance(service, MultiService)
-        expected_services = [
-            "dhcp_probe",
-            "networks_monitor",
-            "image_download",
-            "lease_socket_service",
-            "node_monitor",
-            "external",
-            "rpc",
-            "rpc-ping",
-            "http",
-            "http_service",
-            "tftp",
-            "service_monitor",
-            "version_update_check",
-        ]
-        self.assertThat(service.namedServices, KeysEqual(*expected_services))
+        self.assertEqual(EXPECTED_SERVICE_NAMES, service.namedServices.keys())
         self.assertEqual(
             len(service.namedServices),
             len(service.services),
             "Not all services are named.",
         )
         self.assertEqual(service, provisioningserver.services)
-        self.assertThat(crochet.no_setup, MockCalledOnceWith())
-        self.assertThat(
-            logger.configure,
-            MockCalledOnceWith(
-                options["verbosity"], logger.LoggingMode.TWISTD
-            ),
+        self.mock_no_setup.assert_called_once_with()
+        self.mock_configure.assert_called_once_with(
+            options["verbosity"], logger.LoggingMode.TWISTD
         )
 
     def test_makeService_in_debug(self):
@@ -202,31 +193,16 @@ class TestProvisioningServiceMaker(MAASTestCase):
         self.patch(service_maker, "_loadSettings")
         service = service_maker.makeService(options, clock=None)
         self.assertIsInstance(service, MultiService)
-        expected_services = [
-            "dhcp_probe",
-            "networks_monitor",
-            "image_download",
-            "lease_socket_service",
-            "node_monitor",
-            "external",
-            "rpc",
-            "rpc-ping",
-            "http",
-            "http_service",
-            "tftp",
-            "service_monitor",
-            "version_update_check",
-        ]
-        self.assertThat(service.namedServices, KeysEqual(*expected_services))
+        self.assertEqual(EXPECTED_SERVICE_NAMES, service.namedServices.keys())
         self.assertEqual(
             len(service.namedServices),
             len(service.services),
             "Not all services are named.",
         )
         self.assertEqual(service, provisioningserver.services)
-        self.assertThat(crochet.no_setup, MockCalledOnceWith())
-        self.assertThat(
-            logger.configure, MockCalledOnceWith(3, logger.LoggingMode.TWISTD)
+        self.mock_no_setup.assert_called_once_with()
+        self.mock_configure.assert_called_once_with(
+            3, logger.LoggingMode.TWISTD
         )
 
     def test_makeService_with_EXPERIMENTAL_tftp_offload_service(self):
@@ -240,124 +216,105 @@ class TestProvisioningServiceMaker(MAASTestCase):
         service_maker = ProvisioningServiceMaker("Harry", "Hill")
         service = service_maker.makeService(options, clock=None)
         self.assertIsInstance(service, MultiService)
-        self.assertThat(service.namedServices, Not(Contains("tftp")))
-        self.assertThat(service.namedServices, Contains("tftp-offload"))
+        self.assertNotIn("tftp", service.namedServices)
+        self.assertIn("tftp-offload", service.namedServices)
         tftp_offload_service = service.getServiceNamed("tftp-offload")
-        self.assertThat(tftp_offload_service, IsInstance(TFTPOffloadService))
+        self.assertIsInstance(tftp_offload_service, TFTPOffloadService)
 
     def test_makeService_patches_tftp_service(self):
         mock_tftp_patch = self.patch(plugin_module, "add_patches_to_txtftp")
         options = Options()
         service_maker = ProvisioningServiceMaker("Harry", "Hill")
         service_maker.makeService(options, clock=None)
-        self.assertThat(mock_tftp_patch, MockCalledOnceWith())
+        mock_tftp_patch.assert_called_once_with()
 
     def test_makeService_cleanup_prometheus_dir(self):
-        tmpdir = Path(self.useFixture(TempDirectory()).path)
+        tmpdir = self.make_dir()
         self.useFixture(
-            EnvironmentVariable("prometheus_multiproc_dir", str(tmpdir))
+            EnvironmentVariable("prometheus_multiproc_dir", tmpdir)
         )
         pid = os.getpid()
-        file1 = tmpdir / f"histogram_{pid}.db"
-        file1.touch()
-        file2 = tmpdir / f"histogram_{self.get_unused_pid()}.db"
-        file2.touch()
+        file1 = factory.make_file(tmpdir, f"histogram_{pid}.db", b"")
+        unused_pid = self.get_unused_pid()
+        file2 = factory.make_file(tmpdir, f"histogram_{unused_pid}.db", b"")
 
         service_maker = ProvisioningServiceMaker("Harry", "Hill")
         service_maker.makeService(Options(), clock=None)
-        self.assertTrue(file1.exists())
-        self.assertFalse(file2.exists())
-
-    def test_image_download_service(self):
-        options = Options()
-        service_maker = ProvisioningServiceMaker("Harry", "Hill")
-        service = service_maker.makeService(options, clock=None)
-        image_service = service.getServiceNamed("image_download")
-        self.assertIsInstance(image_service, ImageDownloadService)
-
-    def test_node_monitor_service(self):
-        options = Options()
-        service_maker = ProvisioningServiceMaker("Harry", "Hill")
-        service = service_maker.makeService(options, clock=None)
-        node_monitor = service.getServiceNamed("node_monitor")
-        self.assertIsInstance(node_monitor, NodePowerMonitorService)
-
-    def test_networks_monitor_service(self):
-        options = Options()
-        service_maker = ProvisioningServiceMaker("Spike", "Milligan")
-        service = service_maker.makeService(options, clock=None)
-        networks_monitor = service.getServiceNamed("networks_monitor")
-        self.assertIsInstance(networks_monitor, RackNetworksMonitoringService)
-
-    def test_dhcp_probe_service(self):
-        options = Options()
-        service_maker = ProvisioningServiceMaker("Spike", "Milligan")
-        service = service_maker.makeService(options, clock=None)
-        dhcp_probe = service.getServiceNamed("dhcp_probe")
-        self.assertIsInstance(dhcp_probe, DHCPProbeService)
-
-    def test_service_monitor_service(self):
-        options = Options()
-        service_maker = ProvisioningServiceMaker("Harry", "Hill")
-        service = service_maker.makeService(options, clock=None)
-        service_monitor = service.getServiceNamed("service_monitor")
-        self.assertIsInstance(service_monitor, ServiceMonitorService)
-
-    def test_rpc_ping_service(self):
-        options = Options()
-        service_maker = ProvisioningServiceMaker("Harry", "Hill")
-        service = service_maker.makeService(options, clock=None)
-        rpc_ping = service.getServiceNamed("rpc-ping")
-        self.assertIsInstance(rpc_ping, ClusterClientCheckerService)
-
-    def test_external_service(self):
-        options = Options()
-        service_maker = ProvisioningServiceMaker("Harry", "Hill")
-        service = service_maker.makeService(options, clock=None)
-        external_service = service.getServiceNamed("external")
-        self.assertIsInstance(external_service, RackExternalService)
-
-    def test_version_update_service(self):
-        options = Options()
-        service_maker = ProvisioningServiceMaker("Harry", "Hill")
-        service = service_maker.makeService(options, clock=None)
-        version_check_service = service.getServiceNamed("version_update_check")
-        self.assertIsInstance(version_check_service, VersionUpdateCheckService)
-
-    def test_http_service(self):
-        options = Options()
-        service_maker = ProvisioningServiceMaker("Harry", "Hill")
-        service = service_maker.makeService(options, clock=None)
-        http_service = service.getServiceNamed("http_service")
-        self.assertIsInstance(http_service, StreamServerEndpointService)
+        self.assertTrue(os.path.exists(file1))
+        self.assertFalse(os.path.exists(file2))
+
+
+class TestProvisioningServiceMakerServices(MAASTestCase):
+    """Tests for the services built by `ProvisioningServiceMaker`.
+
+    These tests only inspect the built services, so the service is made
+    once for the whole class.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with ExitStack() as stack:
+            # Build in a pristine MAAS_ROOT and MAAS_DATA, as every test's
+            # setUp would.
+            if "MAAS_ROOT" in os.environ:
+                stack.enter_context(MAASRootFixture())
+            if "MAAS_DATA" in os.environ:
+                stack.enter_context(MAASDataFixture())
+            stack.enter_context(ClusterConfigurationFixture())
+            stack.enter_context(
+                mock.patch.object(
+                    provisioningserver, "services", MultiService()
+                )
+            )
+            stack.enter_context(
+                mock.patch.object(crochet, "no_setup", autospec=True)
+            )
+            stack.enter_context(
+                mock.patch.object(logger, "configure", autospec=True)
+            )
+            stack.enter_context(
+                mock.patch.object(
+                    plugin_module,
+                    "get_shared_secret_from_filesystem",
+                    return_value="secret",
+                )
+            )
+            service_maker = ProvisioningServiceMaker("Harry", "Hill")
+            cls.service = service_maker.makeService(Options(), clock=None)
+            with ClusterConfiguration.open() as config:
+                cls.tftp_root = config.tftp_root
+                cls.tftp_port = config.tftp_port
+
+    @classmethod
+    def tearDownClass(cls):
+        # The HTTP service's endpoint adopted a socket bound to its port.
+        cls.service.getServiceNamed("http_service").endpoint.socket.close()
+        del cls.service
+        super().tearDownClass()
+
+    def test_services_are_of_expected_types(self):
+        expected_types = {
+            "dhcp_probe": DHCPProbeService,
+            "external": RackExternalService,
+            "http_service": StreamServerEndpointService,
+            "image_download": ImageDownloadService,
+            "lease_socket_service": LeaseSocketService,
+            "networks_monitor": RackNetworksMonitoringService,
+            "node_monitor": NodePowerMonitorService,
+            "rpc-ping": ClusterClientCheckerService,
+            "service_monitor": ServiceMonitorService,
+            "version_update_check": VersionUpdateCheckService,
+        }
+        for name, expected_type in expected_types.items():
+            self.assertIsInstance(
+                self.service.getServiceNamed(name), expected_type, name
+            )
 
     def test_tftp_service(self):
         # A TFTP service is configured and added to the top-level service.
-        options = Options()
-        service_maker = ProvisioningServiceMaker("Harry", "Hill")
-        service = service_maker.makeService(options, clock=None)
-        tftp_service = service.getServiceNamed("tftp")
+        tftp_service = self.service.getServiceNamed("tftp")
         self.assertIsInstance(tftp_service, TFTPService)
-
-        with ClusterConfiguration.open() as config:
-            tftp_root = config.tftp_root
-            tftp_port = config.tftp_port
-
-        expected_backend = MatchesAll(
-            IsInstance(TFTPBackend),
-            AfterPreprocessing(
-                lambda backend: backend.base.path, Equals(tftp_root)
-            ),
-        )
-
-        self.assertThat(
-            tftp_service,
-            MatchesStructure(backend=expected_backend, port=Equals(tftp_port)),
-        )
-
-    def test_lease_socket_service(self):
-        options = Options()
-        service_maker = ProvisioningServiceMaker("Harry", "Hill")
-        service = service_maker.makeService(options, clock=None)
-        lease_socket_service = service.getServiceNamed("lease_socket_service")
-        self.assertIsInstance(lease_socket_service, LeaseSocketService)
+        self.assertIsInstance(tftp_service.backend, TFTPBackend)
+        self.assertEqual(self.tftp_root, tftp_service.backend.base.path)
+        self.assertEqual(self.tftp_port, tftp_service.port)
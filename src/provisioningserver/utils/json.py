@@ -0,0 +1,55 @@
+# Copyright 2026 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+"""JSON encoding and decoding, using orjson when it is available."""
+
+__all__ = ["json_dumps", "json_loads"]
+
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # orjson is not installed.
+    orjson = None
+
+# Every integer outside [-2**63, 2**64) has at least 19 digits.
+_LONG_DIGITS = re.compile(r"\d{19}")
+_LONG_DIGITS_BYTES = re.compile(rb"\d{19}")
+
+
+def json_loads(data):
+    """Decode the JSON document in `data`, a `str` or UTF-8 `bytes`.
+
+    orjson silently turns integers outside [-2**63, 2**64) into floats, so
+    documents with runs of 19 or more digits go to the stdlib decoder. So
+    do the documents orjson rejects, such as those holding the NaN and
+    Infinity values that the stdlib encoder can emit. Either way, invalid
+    documents raise `ValueError`.
+    """
+    long_digits = (
+        _LONG_DIGITS_BYTES if isinstance(data, bytes) else _LONG_DIGITS
+    )
+    if orjson is not None and long_digits.search(data) is None:
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            pass
+    return json.loads(data)
+
+
+def json_dumps(obj):
+    """Encode `obj` as a compact JSON document in UTF-8 `bytes`.
+
+    orjson refuses some objects the stdlib encoder accepts, such as
+    non-string keys and very large integers; those are handed to the stdlib
+    encoder. Objects neither can encode raise `TypeError`.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
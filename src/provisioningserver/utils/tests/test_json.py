@@ -0,0 +1,59 @@
+# Copyright 2026 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+"""Tests for `provisioningserver.utils.json`."""
+
+import json
+import math
+
+from maastesting.testcase import MAASTestCase
+from provisioningserver.utils import json as json_module
+from provisioningserver.utils.json import json_dumps, json_loads
+
+
+class TestJSONLoads(MAASTestCase):
+    def test_decodes_str_and_bytes(self):
+        document = {"a": [1, 2.5, None, True], "b": "é"}
+        encoded = json.dumps(document)
+        self.assertEqual(document, json_loads(encoded))
+        self.assertEqual(document, json_loads(encoded.encode("utf-8")))
+
+    def test_decodes_nan_and_infinity(self):
+        self.assertEqual([1, -math.inf], json_loads("[1, -Infinity]"))
+        self.assertTrue(math.isnan(json_loads("NaN")))
+
+    def test_decodes_big_integers_exactly(self):
+        document = [2**64, -(2**63) - 1, 10**30]
+        self.assertEqual(document, json_loads(json.dumps(document)))
+        self.assertEqual(document, json_loads(json_dumps(document)))
+
+    def test_rejects_invalid_documents(self):
+        self.assertRaises(ValueError, json_loads, "{invalid")
+        self.assertRaises(ValueError, json_loads, b"{invalid")
+
+    def test_works_without_orjson(self):
+        self.patch(json_module, "orjson", None)
+        self.assertEqual({"a": 1}, json_loads(b'{"a": 1}'))
+        self.assertRaises(ValueError, json_loads, "{invalid")
+
+
+class TestJSONDumps(MAASTestCase):
+    def test_encodes_to_compact_utf8_bytes(self):
+        self.assertEqual(
+            '{"a":[1,"é"]}'.encode("utf-8"),
+            json_dumps({"a": [1, "é"]}),
+        )
+
+    def test_encodes_objects_orjson_refuses(self):
+        self.assertEqual(b'{"1":2}', json_dumps({1: 2}))
+        self.assertEqual(b"[18446744073709551616]", json_dumps([2**64]))
+
+    def test_rejects_unserializable_objects(self):
+        self.assertRaises(TypeError, json_dumps, object())
+
+    def test_works_without_orjson(self):
+        self.patch(json_module, "orjson", None)
+        self.assertEqual(
+            '{"a":[1,"é"]}'.encode("utf-8"),
+            json_dumps({"a": [1, "é"]}),
+        )